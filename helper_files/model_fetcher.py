@@ -10,9 +10,16 @@
 # Date: 2025-10-04
 # ==========================================================
 
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 import requests
+import requests_cache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # -----------------------------
 # Load API Key from .env
@@ -30,24 +37,124 @@ endpoints = {
     "GitHub GPT-4.1": "https://models.inference.ai.azure.com/openai/deployments/gpt-4.1/chat/completions",
     "GitHub Mistral Small": "https://api.github.ai/v1/chat/completions",
     "xAI Grok-3": "https://api.github.ai/v1/chat/completions",
-    "GitHub Models Catalog": "https://models.inference.ai.azure.com/openai/models",
 }
 
+test_models = [
+    {
+        "name": "GitHub GPT-4.1",
+        "endpoint": "https://models.inference.ai.azure.com/openai/deployments/gpt-4.1/chat/completions",
+        "model": "gpt-4.1",
+    },
+    {
+        "name": "Mistral Small 3.1",
+        "endpoint": "https://models.inference.ai.azure.com/openai/deployments/mistral-small-2503/chat/completions",
+        "model": "mistral-ai/mistral-small-2503",
+    },
+    {
+        "name": "xAI Grok-3",
+        "endpoint": "https://models.inference.ai.azure.com/openai/deployments/xai-grok-3/chat/completions",
+        "model": "xai/grok-3",
+    },
+]
+
+# The catalog changes rarely, so it is fetched once and cached for a day
+# (reachability is reported by the catalog listing below rather than a separate probe)
+CATALOG_URL = "https://models.inference.ai.azure.com/openai/models"
+CATALOG_TTL = 86400  # seconds
+
+# -----------------------------
+# Shared session (keep-alive connection pooling + local response cache)
+# -----------------------------
+# (connect, read) timeouts so a dead endpoint fails in ~3s
+TIMEOUT = (3.05, 30)
+PROBE_TIMEOUT = (3.05, 15)
+
+# Successful GET responses (i.e. the catalog) are served from a SQLite cache in
+# the user cache directory for a day. Reachability probes and live POST tests
+# always hit the network. requests-cache leaves Authorization out of its cache
+# keys, so the cache file is named per token: a revoked or different token
+# never sees another token's results.
+TOKEN_ID = hashlib.sha256(GITHUB_API_KEY.encode()).hexdigest()[:12]
+SESSION = requests_cache.CachedSession(
+    f"gh_models_{TOKEN_ID}",
+    backend="sqlite",
+    use_cache_dir=True,
+    expire_after=requests_cache.DO_NOT_CACHE,  # only the catalog below is cached
+    urls_expire_after={CATALOG_URL: CATALOG_TTL},
+    allowable_methods=("GET",),
+)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=1,
+        backoff_factor=0.3,
+        # 429 is left out on purpose: rate limits on GitHub Models last a minute or
+        # more, so the service's "wait N seconds" error should reach the user at once
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+        # Never block on a server-sent Retry-After; keep to the short backoff above
+        respect_retry_after_header=False,
+    ),
+))
+
 headers = {
     "Authorization": f"Bearer {GITHUB_API_KEY}",
     "Accept": "application/json"
 }
+test_headers = {**headers, "Content-Type": "application/json"}
+
+# -----------------------------
+# Request helpers
+# -----------------------------
+def probe(url):
+    """Send a lightweight request to an endpoint and return the response."""
+    # For chat/completions, use HEAD to avoid triggering a real completion
+    method = "HEAD" if "completions" in url else "GET"
+    # HEAD is not a cacheable method on SESSION, so probes always hit the network
+    return SESSION.request(method, url, headers=headers, timeout=PROBE_TIMEOUT)
+
+
+def fetch_catalog():
+    """Return the GitHub Models catalog and whether it came from the local cache."""
+    resp = SESSION.get(CATALOG_URL, headers=headers, timeout=TIMEOUT)
+    resp.raise_for_status()
+    return orjson.loads(resp.content), resp.from_cache
+
+
+def live_test(tm):
+    """POST a minimal completion request to a test model and return the response."""
+    test_payload = {
+        "model": tm["model"],
+        "messages": [
+            {"role": "user", "content": f"Say 'Connection OK' if you can read this. (Testing {tm['name']})"}
+        ],
+        "temperature": 0
+    }
+    return SESSION.post(tm["endpoint"], headers=test_headers, data=orjson.dumps(test_payload), timeout=TIMEOUT)
+
+
+# -----------------------------
+# Dispatch every request up front
+# -----------------------------
+# Probes, the catalog fetch and the live tests are all independent, so they
+# share one pool (and the session's keep-alive connections) and the script
+# takes as long as the slowest request. Results are reported in order below.
+executor = ThreadPoolExecutor(max_workers=len(endpoints) + 1 + len(test_models))
+probes = {name: executor.submit(probe, url) for name, url in endpoints.items()}
+catalog = executor.submit(fetch_catalog)
+live_tests = [(tm, executor.submit(live_test, tm)) for tm in test_models]
 
 # -----------------------------
 # Check each endpoint (HEAD/GET)
 # -----------------------------
 print("🔍 Checking GitHub Models API endpoints...\n")
 
-for name, url in endpoints.items():
+for name, future in probes.items():
     try:
-        # For chat/completions, use HEAD to avoid triggering a real completion
-        method = "HEAD" if "completions" in url else "GET"
-        resp = requests.request(method, url, headers=headers, timeout=15)
+        resp = future.result()
         status = resp.status_code
 
         if status == 200:
@@ -66,17 +173,15 @@ for name, url in endpoints.items():
 # Optionally, list all models
 # -----------------------------
 try:
-    print("\n📋 Retrieving available models from GitHub Models catalog...")
-    url = "https://models.inference.ai.azure.com/openai/models"
-    resp = requests.get(url, headers=headers, timeout=30)
-    resp.raise_for_status()
-    models = resp.json()
+    print(f"\n📋 Retrieving available models from GitHub Models catalog (cached for {CATALOG_TTL // 3600}h)...")
+    models, from_cache = catalog.result()
 
-    print("\n✅ Models available to your GitHub token:\n")
+    cached_note = " (cached)" if from_cache else ""
+    print(f"\n✅ Models available to your GitHub token{cached_note}:\n")
     for model in models.get("data", []):
         print(f"- {model.get('id')} ({model.get('object')})")
 
-except Exception as e:
+except (requests.exceptions.RequestException, ValueError) as e:
     print(f"\n❌ Error retrieving model catalog: {e}")
 
 # -----------------------------
@@ -84,43 +189,12 @@ except Exception as e:
 # -----------------------------
 print("\n🚀 Performing live completion tests on all GitHub Models endpoints...\n")
 
-test_models = [
-    {
-        "name": "GitHub GPT-4.1",
-        "endpoint": "https://models.inference.ai.azure.com/openai/deployments/gpt-4.1/chat/completions",
-        "model": "gpt-4.1",
-    },
-    {
-        "name": "Mistral Small 3.1",
-        "endpoint": "https://models.inference.ai.azure.com/openai/deployments/mistral-small-2503/chat/completions",
-        "model": "mistral-ai/mistral-small-2503",
-    },
-    {
-        "name": "xAI Grok-3",
-        "endpoint": "https://models.inference.ai.azure.com/openai/deployments/xai-grok-3/chat/completions",
-        "model": "xai/grok-3",
-    },
-]
-
-for tm in test_models:
+for tm, future in live_tests:
     print(f"🧩 Testing {tm['name']} ...")
     try:
-        test_headers = {
-            "Authorization": f"Bearer {GITHUB_API_KEY}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        test_payload = {
-            "model": tm["model"],
-            "messages": [
-                {"role": "user", "content": f"Say 'Connection OK' if you can read this. (Testing {tm['name']})"}
-            ],
-            "temperature": 0
-        }
-
-        response = requests.post(tm["endpoint"], headers=test_headers, json=test_payload, timeout=30)
+        response = future.result()
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             message = data["choices"][0]["message"]["content"]
             print(f"✅ {tm['name']} responded successfully:\n{message}\n")
         elif response.status_code in (401, 403):
@@ -128,9 +202,12 @@ for tm in test_models:
         elif response.status_code in (404, 405):
             print(f"⚠️ {tm['name']} – Endpoint exists but requires different deployment route ({response.status_code}).")
         else:
-            print(f"⚠️ {tm['name']} returned {response.status_code}: {response.text[:300]}")
+            # Decode only the bytes we print; .text would decode (and charset-sniff) the whole body
+            snippet = response.content[:300].decode(response.encoding or "utf-8", errors="replace")
+            print(f"⚠️ {tm['name']} returned {response.status_code}: {snippet}")
 
-    except Exception as e:
+    except (requests.exceptions.RequestException, KeyError, IndexError, ValueError) as e:
         print(f"❌ Error testing {tm['name']}: {e}\n")
 
+executor.shutdown()
 print("\n✅ Live inference tests complete.\n")
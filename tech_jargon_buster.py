@@ -27,12 +27,25 @@ Description:
 """
 
 import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Literal, Optional
+
+import orjson
 import requests
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from azure.ai.inference import ChatCompletionsClient
 from azure.ai.inference.models import SystemMessage, UserMessage
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import RequestsTransport
 
 # ========================
 # Load environment variables
@@ -53,42 +66,151 @@ GITHUB_GPT_MODEL = "gpt-4.1"
 
 # GitHub Models - Mistral Small
 GITHUB_MISTRAL_ENDPOINT = "https://models.github.ai/inference"
-GITHUB_MISTRAL_MODEL = "mistral-small-2503"
+GITHUB_MISTRAL_MODEL = "mistral-ai/mistral-small-2503"
 
 # GitHub Models -  xAI Grok
 GITHUB_GROK_ENDPOINT = "https://models.github.ai/inference"
 GITHUB_GROK_MODEL = "xai/grok-3"
 
+@dataclass(frozen=True)
+class ProviderCfg:
+    """Everything that differs between the model connectors."""
+    label: str                          # column heading shown in the UI
+    endpoint: str
+    model: str
+    sdk: Literal["requests", "azure"]   # plain REST + SSE, or Azure AI Inference SDK
+    max_temp: float                     # highest temperature the model accepts
+
+# Column order in the UI follows this table
+PROVIDERS = {
+    "gpt": ProviderCfg("GitHub Models GPT-4.1", GITHUB_GPT_ENDPOINT, GITHUB_GPT_MODEL, "requests", 2.0),
+    "mistral": ProviderCfg("GitHub Models Mistral Small 3.1", GITHUB_MISTRAL_ENDPOINT, GITHUB_MISTRAL_MODEL, "azure", 1.0),
+    "grok": ProviderCfg("xAI Grok-3", GITHUB_GROK_ENDPOINT, GITHUB_GROK_MODEL, "azure", 2.0),
+}
+
 # ========================
-# Streamlit UI
+# Request templates
 # ========================
-st.title("Tech Jargon Buster")
+# Constant parts of each request, built once; call_llm only fills in the
+# model, term, temperature and max length. The system message carries the style
+# instructions, so the per-term user prompt stays short.
+SYSTEM_PROMPT = (
+    "You are an IT jargon explainer. Keep responses beginner-friendly, "
+    "with examples and real-world analogies."
+)
+USER_PROMPT = "Explain the IT jargon term '{term}' in simple language."
+# Cut off rambling generations early
+STOP_SEQUENCES = ["\n\n\n"]
+
+REST_HEADERS = {
+    "Authorization": f"Bearer {GITHUB_API_KEY}",
+    "Content-Type": "application/json"
+}
+REST_PAYLOAD_TEMPLATE = {
+    "stop": STOP_SEQUENCES,
+    "stream": True
+}
+REST_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+SDK_SYSTEM_MESSAGE = SystemMessage(SYSTEM_PROMPT)
 
-st.markdown(
+# ========================
+# Shared HTTP session
+# ========================
+# (connect, read) timeouts: a dead endpoint fails in ~3s instead of waiting out the full read timeout
+TIMEOUT = (3.05, 30)
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Build one pooled requests.Session, reused across calls and Streamlit reruns."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=2,
+            connect=2,
+            read=1,
+            backoff_factor=0.3,
+            # 429 is left out on purpose: rate limits on GitHub Models last a minute or
+            # more, so the service's "wait N seconds" error should reach the user at once
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+            # Never block on a server-sent Retry-After; keep to the short backoff above
+            respect_retry_after_header=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_sdk_session() -> requests.Session:
+    """Build the pooled session used underneath the Azure SDK clients.
+
+    Same pool size as get_session(), but with urllib3 retries disabled (as
+    azure-core does for its own sessions) so the SDK's RetryPolicy and error
+    types see the real HTTP statuses.
     """
-    <style>
-        .block-container {
-            max-width: 1800px;   /* widen the full app container */
-            padding-left: 2rem;
-            padding-right: 2rem;
-        }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+    )
+    session.mount("https://", adapter)
+    return session
+
+def get_transport() -> RequestsTransport:
+    """Wrap the SDK session as an azure-core transport for the SDK clients.
+
+    Mistral and Grok live on the same host, so sharing one keep-alive pool lets
+    their concurrent calls reuse connections instead of each opening its own.
+    """
+    return RequestsTransport(
+        session=get_sdk_session(),
+        session_owner=False,
+        connection_timeout=TIMEOUT[0],
+        read_timeout=TIMEOUT[1],
+    )
+
+def _warm(session: requests.Session, url: str) -> None:
+    """Open a keep-alive connection to url; the response itself is irrelevant."""
+    try:
+        session.head(url, timeout=3)
+    except requests.RequestException:
+        pass  # best-effort; the real call will simply connect on its own
 
-user_input = st.text_input("Enter an IT jargon term:")
-# Add slider for temperature
-slider_temperature = st.slider(
-    "Creativity (temperature)",
-    min_value=0.0,
-    max_value=1.5,
-    value=0.4,      # default value; 0.7 is standard
-    step=0.1,
-    help="Lower values = more focused. Higher values = more creative."
-)
-st.markdown("*Move the slider left for straightforward answers, or right for more creative ones.*")
-submit = st.button("Explain")
+@st.cache_resource
+def warm_connections() -> None:
+    """Pre-populate each host's pool, once per server process.
+
+    Warmed up so the first Explain click doesn't pay for the TCP + TLS
+    handshakes; each host is warmed on the session its connectors use.
+    """
+    targets = (
+        (get_session(), "https://models.inference.ai.azure.com/openai/models"),
+        (get_sdk_session(), "https://models.github.ai/inference"),
+    )
+    for session, url in targets:
+        threading.Thread(target=_warm, args=(session, url), daemon=True).start()
+
+warm_connections()
+
+# ========================
+# Streamlit UI
+# ========================
+# Static page chrome lives in a constant so reruns don't rebuild it
+PAGE_CSS = """
+<style>
+    .block-container {
+        max-width: 1800px;   /* widen the full app container */
+        padding-left: 2rem;
+        padding-right: 2rem;
+    }
+</style>
+"""
+
+st.title("Tech Jargon Buster")
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 # ========================
 # Helper: Simple IT check
@@ -99,111 +221,170 @@ IT_KEYWORDS = [
     "sdk", "json", "xml", "html", "css", "javascript", "python", "java", "c++",
     "docker", "kubernetes", "vmware", "hypervisor", "cloud", "aws", "azure",
     "gcp", "linux", "windows", "unix", "kernel", "sql", "nosql", "mongodb",
-    "postgresql", "mysql", "ssh", "ftp", "smtp", "imap", "oauth", "rest"
+    "postgresql", "mysql", "ssh", "ftp", "smtp", "imap", "oauth", "rest",
+    "sftp", "ipsec", "dnssec", "restful", "sqli", "sshd"
 ]
 
+@st.cache_resource
+def _it_keyword_re() -> re.Pattern:
+    """Compile the IT keyword matcher once per server process, not per rerun."""
+    # One pass over the input instead of a substring scan per keyword.
+    # Keywords must match as whole words (so "apiary" no longer counts as "api"),
+    # optionally followed by a plural "s" or a version ("OAuth2", "TLS1.3",
+    # "SSLv3", "C++17"). Word edges are "not a letter or digit" rather than \b,
+    # so keywords ending in symbols ("c++") and snake_case ("api_key") match.
+    return re.compile(
+        r"(?<![^\W_])(?:" + "|".join(map(re.escape, IT_KEYWORDS)) + r")(?:s|v?\d[\d.]*)?(?![^\W_])",
+        re.IGNORECASE,
+    )
+
 def is_it_term(term: str) -> bool:
     """Check if a term is IT-related by matching keywords."""
-    term_lower = term.lower()
-    return any(word in term_lower for word in IT_KEYWORDS)
+    return _it_keyword_re().search(term) is not None
 
 # ========================
-# GitHub Models ChatGPT-4.1 Connector
+# Helper: Streaming
 # ========================
-def call_github_gpt(term: str, temperature: float) -> str:
-    """Call GitHub Models GPT-4.1 endpoint to explain IT jargon."""
-    headers = {
-        "Authorization": f"Bearer {GITHUB_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": GITHUB_GPT_MODEL,
-        "messages": [
-            {"role": "system", "content": "You are an IT jargon explainer. Keep responses beginner-friendly."},
-            {"role": "user", "content": f"Explain the IT jargon term '{term}' in simple language with a real-world analogy."}
-        ],
-        "temperature": temperature
-    }
+def _collect(deltas: Iterable[str], on_delta: Optional[Callable[[str], None]]) -> str:
+    """Join streamed text deltas, forwarding each one to on_delta as it arrives."""
+    chunks = []
+    for delta in deltas:
+        if delta:
+            chunks.append(delta)
+            if on_delta:
+                on_delta(delta)
+    return "".join(chunks).strip()
+
+def _raise_for_status(resp: requests.Response) -> None:
+    """Like resp.raise_for_status(), but keep the service's error message.
+
+    GitHub Models explains failures (e.g. "Please wait 42 seconds") in the JSON
+    body, which raise_for_status() drops.
+    """
+    if resp.status_code < 400:
+        return
     try:
-        resp = requests.post(GITHUB_GPT_ENDPOINT, headers=headers, json=payload, timeout=30)
+        message = orjson.loads(resp.content)["error"]["message"]
+    except (ValueError, KeyError, TypeError):
+        message = None
+    if not message:
         resp.raise_for_status()
-        return resp.json()["choices"][0]["message"]["content"].strip()
-    except Exception as e:
-        return f"❌ Error calling GitHub Models GPT-4.1: {e}"
+    raise requests.HTTPError(f"{resp.status_code} {resp.reason}: {message}", response=resp)
+
+def _iter_sse_deltas(resp: requests.Response) -> Iterator[str]:
+    """Yield the content deltas from an OpenAI-style server-sent events response."""
+    for line in resp.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        data = line[len(b"data:"):].strip()
+        if data == b"[DONE]":
+            break
+        choices = orjson.loads(data).get("choices") or []
+        if choices:
+            yield (choices[0].get("delta") or {}).get("content") or ""
 
 # ========================
-# GitHub Models Mistral Small 3.1 Connector
+# LLM Connector
 # ========================
-def call_github_mistral(term: str, temperature: float) -> str:
-    """Call GitHub Models Mistral Small 3.1 using Azure AI Inference SDK."""
-    try:
-        # --------- SAFETY GUARD ----------
-        # Cap temperature within 0.0–1.0 since Mistral rejects higher values
-        safe_temp = min(max(temperature, 0.0), 1.0)
-
-        # Notify user if their chosen temperature exceeded Mistral's limit
-        if temperature > 1.0:
-            st.info("⚠️ Mistral model supports up to temperature 1.0 — adjusted automatically.")
-
-        client = ChatCompletionsClient(
-            endpoint="https://models.github.ai/inference",
-            credential=AzureKeyCredential(GITHUB_API_KEY),
-        )
-
-        response = client.complete(
-            messages=[
-                SystemMessage("You are an IT jargon explainer. Keep responses beginner-friendly."),
-                UserMessage(f"Explain the IT jargon term '{term}' with real-world analogies.")
-            ],
-            temperature=safe_temp,
-            top_p=1.0,
-            max_tokens=500,
-            model="mistral-ai/mistral-small-2503"
-        )
-
-        return response.choices[0].message.content
-
-    except Exception as e:
-        return f"❌ Error calling GitHub Models Mistral Small 3.1: {e}"
-
-# =======================
-# GitHub Models xAI Grok-3 Connector
-# ========================
-def call_grok(term: str, temperature: float) -> str:
-    """Call GitHub Models xAI Grok-3 using Azure AI Inference SDK."""
-    try:
-        client = ChatCompletionsClient(
-            endpoint=GITHUB_GROK_ENDPOINT,
-            credential=AzureKeyCredential(GITHUB_API_KEY),
-        )
-
-        response = client.complete(
-            messages=[
-                SystemMessage("You are an IT jargon explainer. Keep responses beginner-friendly."),
-                UserMessage(f"Explain the IT jargon term '{term}' with examples and analogies.")
-            ],
-            temperature=temperature,
-            top_p=1.0,
-            max_tokens=500,
-            model=GITHUB_GROK_MODEL
-        )
-
-        return response.choices[0].message.content
+@st.cache_resource
+def _sdk_client(endpoint: str) -> ChatCompletionsClient:
+    """Build one Azure AI Inference client per endpoint and reuse its transport.
 
-    except Exception as e:
-        return f"❌ Error calling GitHub Models xAI Grok-3: {e}"
+    Mistral and Grok share an endpoint, so they share a client; the model is
+    chosen per call.
+    """
+    return ChatCompletionsClient(
+        endpoint=endpoint,
+        credential=AzureKeyCredential(GITHUB_API_KEY),
+        transport=get_transport(),
+        # Match the REST path's urllib3 Retry: no status retries (azure-core
+        # always honours Retry-After, and rate limits last a minute or more),
+        # a couple of quick connect/read retries
+        retry_status=0,
+        retry_connect=2,
+        retry_read=1,
+        retry_backoff_factor=0.3,
+    )
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def call_llm(
+    provider: str, term: str, temperature: float, max_tokens: int,
+    _on_delta: Optional[Callable[[str], None]] = None
+) -> str:
+    """Ask one of the PROVIDERS to explain an IT jargon term.
+
+    Streams the answer through _on_delta (not part of the cache key) and
+    returns the full text. Raises on failure so that errors are never cached.
+    """
+    cfg = PROVIDERS[provider]
+    # --------- SAFETY GUARD ----------
+    # Cap temperature to what the model accepts (e.g. Mistral rejects > 1.0);
+    # the user is notified from the main thread before dispatch
+    safe_temp = min(max(temperature, 0.0), cfg.max_temp)
+    prompt = USER_PROMPT.format(term=term)
+
+    if cfg.sdk == "requests":
+        payload = {
+            **REST_PAYLOAD_TEMPLATE,
+            "model": cfg.model,
+            "messages": [REST_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            "temperature": safe_temp,
+            "max_tokens": max_tokens
+        }
+        with get_session().post(cfg.endpoint, headers=REST_HEADERS, data=orjson.dumps(payload), timeout=TIMEOUT, stream=True) as resp:
+            _raise_for_status(resp)
+            return _collect(_iter_sse_deltas(resp), _on_delta)
+
+    # Closing the stream returns its connection to the pool even if it fails part-way
+    with _sdk_client(cfg.endpoint).complete(
+        messages=[SDK_SYSTEM_MESSAGE, UserMessage(prompt)],
+        temperature=safe_temp,
+        top_p=1.0,
+        max_tokens=max_tokens,
+        stop=STOP_SEQUENCES,
+        stream=True,
+        model=cfg.model
+    ) as response:
+        deltas = (update.choices[0].delta.content or "" for update in response if update.choices)
+        return _collect(deltas, _on_delta)
 
 # ========================
 # Main Logic
 # ========================
-if submit:
+# Failures a provider can legitimately produce (network, HTTP/SDK errors,
+# malformed responses); these are shown as a plain error message
+CONNECTOR_ERRORS = (requests.RequestException, AzureError, KeyError, ValueError)
+
+@st.fragment
+def explain_panel(max_tokens: int) -> None:
+    """Render the input widgets and, on Explain, the three explanations.
+
+    Runs as a fragment, so moving the slider or clicking Explain reruns only
+    this panel instead of the whole script.
+    """
+    user_input = st.text_input("Enter an IT jargon term:")
+    # Add slider for temperature
+    slider_temperature = st.slider(
+        "Creativity (temperature)",
+        min_value=0.0,
+        max_value=1.5,
+        value=0.4,      # default value; 0.7 is standard
+        step=0.1,
+        help="Lower values = more focused. Higher values = more creative."
+    )
+    st.markdown("*Move the slider left for straightforward answers, or right for more creative ones.*")
+    submit = st.button("Explain")
+
+    if not submit:
+        return
+
     # TERM override allows bypassing IT keyword check
     if user_input.startswith("TERM:"):
         term = user_input.replace("TERM:", "").strip()
     else:
         if not is_it_term(user_input):
             st.warning("⚠️ The term entered is not considered a known IT term. Try again, or override with TERM:. For example:  TERM:FTP")
-            st.stop()
+            return
         term = user_input.strip()
 
     st.write(f"### Explanations for: {term}")
@@ -211,19 +392,77 @@ if submit:
 # ========================
 # UI layout
 # ========================
-    # Create 3 columns for horizontal layout
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.subheader("GitHub Models GPT-4.1")
-        st.write(call_github_gpt(term, slider_temperature))
-
-    with col2:
-        st.subheader("GitHub Models Mistral Small 3.1")
-        st.write(call_github_mistral(term, slider_temperature))
+    # Notify user if their chosen temperature exceeds a model's limit.
+    # Done here because Streamlit elements can't be rendered from worker threads.
+    for cfg in PROVIDERS.values():
+        if slider_temperature > cfg.max_temp:
+            st.info(f"⚠️ {cfg.label} supports up to temperature {cfg.max_temp} — adjusted automatically.")
+
+    # Round to the slider step so repeated terms hit the explanation cache
+    temperature = round(slider_temperature, 1)
+
+    # Create 3 columns for horizontal layout, each with a placeholder that is
+    # filled in as tokens stream back
+    providers = list(PROVIDERS.items())
+    placeholders = []
+    for col, (_, cfg) in zip(st.columns(len(providers)), providers):
+        with col:
+            st.subheader(cfg.label)
+            placeholders.append(st.empty())
+            placeholders[-1].caption("Thinking...")
+
+    # Fire all requests at once so total latency is the slowest call, not the
+    # sum of all three. Workers can't touch Streamlit elements, so they push
+    # (column, delta) onto a queue and the main thread does the rendering.
+    # A None delta marks that the column's call has finished.
+    # Workers get this run's ScriptRunContext so the st.cache_data /
+    # st.cache_resource calls they make behave as on the main thread (and
+    # don't log "missing ScriptRunContext" on every call).
+    updates = queue.Queue()
+    with ThreadPoolExecutor(
+        max_workers=len(providers),
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx()),
+    ) as executor:
+        futures = []
+        for i, (provider, _) in enumerate(providers):
+            future = executor.submit(
+                call_llm, provider, term, temperature, max_tokens,
+                _on_delta=lambda delta, i=i: updates.put((i, delta)),
+            )
+            future.add_done_callback(lambda _, i=i: updates.put((i, None)))
+            futures.append(future)
+
+        partial = [""] * len(providers)
+        pending = len(providers)
+        while pending:
+            i, delta = updates.get()
+            if delta is not None:
+                partial[i] += delta
+                placeholders[i].markdown(partial[i])
+                continue
+
+            pending -= 1
+            try:
+                # A cache hit skips streaming entirely, so always render the final text
+                placeholders[i].markdown(futures[i].result())
+            except CONNECTOR_ERRORS as e:
+                placeholders[i].markdown(f"❌ Error calling {providers[i][1].label}: {e}")
+            except Exception as e:
+                # Anything else is a bug, not a provider failure; show the traceback
+                placeholders[i].exception(e)
+
+# Fragments can't write to the sidebar, so the length control lives out here
+# and is passed in; changing it reruns the whole script
+max_length = st.sidebar.slider(
+    "Max length",
+    min_value=100,
+    max_value=500,
+    value=220,
+    step=20,
+    help="Maximum response length in tokens. Shorter answers arrive faster."
+)
 
-    with col3:
-        st.subheader("xAI Grok-3")
-        st.write(call_grok(term, slider_temperature))
+explain_panel(max_length)
 
 # © 2025 Brock Frary. All rights reserved.
\ No newline at end of file